@@ -6,10 +6,11 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, Platform
 from homeassistant.core import HomeAssistant
-from walutomat_py import WalutomatClient
 
+from .client import get_client_registry
 from .const import DOMAIN
 from .coordinator import WalutomatBalancesCoordinator, WalutomatRatesCoordinator
+from .services import async_setup_services, async_unload_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,8 +29,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Create a balances coordinator only if an API key is provided
     if entry.data.get(CONF_API_KEY):
-        client = WalutomatClient(
-            api_key=entry.data[CONF_API_KEY], sandbox=entry.data.get("sandbox", False)
+        client = get_client_registry(hass).get_client(
+            entry.data[CONF_API_KEY], entry.data.get("sandbox", False)
         )
         balances_coordinator = WalutomatBalancesCoordinator(hass, entry, client)
         await balances_coordinator.async_config_entry_first_refresh()
@@ -38,6 +39,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             "balances_coordinator": balances_coordinator
         }
 
+    await async_setup_services(hass)
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
@@ -55,18 +58,43 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         # Clean up the entry-specific data
         if entry.entry_id in hass.data[DOMAIN]:
-            hass.data[DOMAIN].pop(entry.entry_id)
+            entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+            # Don't leave a running profile waiting for a dropped coordinator
+            entry_data["balances_coordinator"].async_stop_profiling()
 
         # If this was the last entry, clean up global data
         if len(all_entries) == 1:
             if "rates_coordinator" in hass.data[DOMAIN]:
-                hass.data[DOMAIN].pop("rates_coordinator")
+                hass.data[DOMAIN].pop("rates_coordinator").async_stop_profiling()
             if "rate_sensors_created" in hass.data[DOMAIN]:
                 hass.data[DOMAIN].pop("rate_sensors_created")
+            if "client_registry" in hass.data[DOMAIN]:
+                hass.data[DOMAIN].pop("client_registry")
+            await async_unload_services(hass)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the shared client and history when a config entry is removed."""
+    # Look up without creating, the last entry has already been unloaded
+    registry = hass.data.get(DOMAIN, {}).get("client_registry")
+    if registry is not None and entry.data.get(CONF_API_KEY):
+        registry.remove(entry.data[CONF_API_KEY], entry.data.get("sandbox", False))
+
+    # The history is kept across reloads and only dropped with the entries
+    if (history := hass.data.get(DOMAIN, {}).get("history")) is not None:
+        other_entries = [
+            other
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        ]
+        if other_entries:
+            history.remove_source(entry.entry_id)
+        else:
+            hass.data[DOMAIN].pop("history")
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     _LOGGER.debug("Reloading integration to apply updated options")
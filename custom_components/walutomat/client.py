@@ -0,0 +1,83 @@
+"""Shared Walutomat API clients for the Walutomat integration."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant
+from walutomat_py import WalutomatClient
+
+from .const import BALANCES_CACHE_TTL, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, bool]
+
+
+class WalutomatClientRegistry:
+    """Keep one client per API key and sandbox flag.
+
+    The config flow validates an API key by fetching balances. That result is
+    kept for a short time so the first refresh of the balances coordinator
+    can reuse it instead of calling the API again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._clients: Dict[ClientKey, WalutomatClient] = {}
+        self._balances: Dict[ClientKey, Tuple[float, List[Dict[str, Any]]]] = {}
+
+    def get_client(self, api_key: str, sandbox: bool) -> WalutomatClient:
+        """Return the client for the given credentials, creating it if needed."""
+        key = (api_key, sandbox)
+        if key not in self._clients:
+            self._clients[key] = WalutomatClient(api_key=api_key, sandbox=sandbox)
+        return self._clients[key]
+
+    async def async_validate(self, api_key: str, sandbox: bool) -> List[Dict[str, Any]]:
+        """Fetch balances to validate the credentials and cache the result.
+
+        The client is only kept once the credentials have been accepted.
+        Expired results of earlier validations are dropped here, so flows that
+        never set up an entry do not leave balances behind.
+        """
+        now = time.monotonic()
+        for expired in [
+            cached_key
+            for cached_key, (fetched_at, _) in self._balances.items()
+            if now - fetched_at > BALANCES_CACHE_TTL
+        ]:
+            del self._balances[expired]
+
+        key = (api_key, sandbox)
+        client = self._clients.get(key) or WalutomatClient(api_key=api_key, sandbox=sandbox)
+        balances = await self.hass.async_add_executor_job(client.get_balances)
+        self._clients[key] = client
+        self._balances[key] = (time.monotonic(), balances)
+        return balances
+
+    def pop_balances(self, api_key: str, sandbox: bool) -> List[Dict[str, Any]] | None:
+        """Return cached balances once if they are still fresh."""
+        cached = self._balances.pop((api_key, sandbox), None)
+        if cached is None:
+            return None
+        fetched_at, balances = cached
+        if time.monotonic() - fetched_at > BALANCES_CACHE_TTL:
+            return None
+        _LOGGER.debug("Reusing balances fetched during validation")
+        return balances
+
+    def remove(self, api_key: str, sandbox: bool) -> None:
+        """Forget the client and any cached data for the given credentials."""
+        self._clients.pop((api_key, sandbox), None)
+        self._balances.pop((api_key, sandbox), None)
+
+
+def get_client_registry(hass: HomeAssistant) -> WalutomatClientRegistry:
+    """Return the client registry, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "client_registry" not in domain_data:
+        domain_data["client_registry"] = WalutomatClientRegistry(hass)
+    return domain_data["client_registry"]
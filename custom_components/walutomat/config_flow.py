@@ -6,13 +6,16 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from walutomat_py import WalutomatAPIError, WalutomatClient
+from walutomat_py import WalutomatAPIError
 
+from .client import get_client_registry
 from .const import (
     CONF_API_KEY,
     CONF_BALANCES_UPDATE_INTERVAL,
+    CONF_FEE_PERCENT,
     CONF_RATES_UPDATE_INTERVAL,
     DEFAULT_BALANCES_UPDATE_INTERVAL,
+    DEFAULT_FEE_PERCENT,
     DEFAULT_RATES_UPDATE_INTERVAL,
     DOMAIN,
     AVAILABLE_CURRENCY_PAIRS,
@@ -43,9 +46,8 @@ class WalutomatConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if not api_key:
             return
 
-        client = WalutomatClient(api_key=api_key, sandbox=sandbox)
-        # We need to run the blocking get_balances call in an executor
-        await self.hass.async_add_executor_job(client.get_balances)
+        # The balances fetched here are reused by the first coordinator refresh
+        await get_client_registry(self.hass).async_validate(api_key, sandbox)
 
     async def async_step_user(
         self, user_input: Dict[str, Any] | None = None
@@ -126,6 +128,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         currency_pairs = self.config_entry.options.get(
             CONF_CURRENCY_PAIRS, DEFAULT_CURRENCY_PAIRS
         )
+        fee_percent = self.config_entry.options.get(
+            CONF_FEE_PERCENT, DEFAULT_FEE_PERCENT
+        )
 
         options_schema = {
             vol.Required(
@@ -140,6 +145,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     sort=True,
                 )
             ),
+            vol.Optional(
+                CONF_FEE_PERCENT, default=fee_percent
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
         }
 
         # Only show balances interval if API key is configured
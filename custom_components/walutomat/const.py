@@ -7,10 +7,19 @@ PLATFORMS = ["sensor"]
 CONF_API_KEY = "api_key"
 CONF_BALANCES_UPDATE_INTERVAL = "balances_update_interval"
 CONF_RATES_UPDATE_INTERVAL = "rates_update_interval"
+CONF_FEE_PERCENT = "fee_percent"
 
 # Defaults
 DEFAULT_BALANCES_UPDATE_INTERVAL = 5  # in minutes
 DEFAULT_RATES_UPDATE_INTERVAL = 1  # in minutes
+DEFAULT_FEE_PERCENT = 0.0  # exchange fee used by the quote service
+
+# How long balances fetched while validating an API key may be reused
+BALANCES_CACHE_TTL = 60  # in seconds
+
+# History kept in memory for the export_history service
+HISTORY_MAX_SNAPSHOTS = 5000
+EXPORT_CHUNK_SIZE = 500  # rows written at a time
 
 # Currency Pairs
 CONF_CURRENCY_PAIRS = "currency_pairs"
@@ -1,15 +1,20 @@
 """DataUpdateCoordinators for the Walutomat integration."""
+from __future__ import annotations
+
 import asyncio
 import logging
+from abc import ABC, abstractmethod
 from datetime import timedelta
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, TypeVar
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from walutomat_py import WalutomatAPIError, WalutomatClient
 
+from .client import get_client_registry
 from .const import (
+    CONF_API_KEY,
     CONF_BALANCES_UPDATE_INTERVAL,
     CONF_CURRENCY_PAIRS,
     CONF_RATES_UPDATE_INTERVAL,
@@ -18,16 +23,87 @@ from .const import (
     DEFAULT_RATES_UPDATE_INTERVAL,
     DOMAIN,
 )
+from .history import get_history
+from .profiler import ProfileCycle, RefreshProfiler
 
 _LOGGER = logging.getLogger(__name__)
 
+_DataT = TypeVar("_DataT")
+_T = TypeVar("_T")
+
+
+class WalutomatCoordinator(DataUpdateCoordinator[_DataT], ABC):
+    """Base coordinator with optional refresh profiling."""
+
+    profiler: RefreshProfiler | None = None
+    _profile_cycle: ProfileCycle | None = None
+
+    @property
+    def profile_name(self) -> str:
+        """Return the name used to tag profiled spans."""
+        return self.name
+
+    @abstractmethod
+    async def _async_fetch(self) -> _DataT:
+        """Fetch data from the API."""
+
+    async def _async_update_data(self) -> _DataT:
+        """Fetch data, timing the refresh when a profiler is attached."""
+        if self.profiler is None:
+            return await self._async_fetch()
 
-class WalutomatBalancesCoordinator(DataUpdateCoordinator[List[Dict[str, Any]]]):
+        self._profile_cycle = self.profiler.start_cycle(self.profile_name)
+        try:
+            with self._profile_cycle.span("update_data"):
+                return await self._async_fetch()
+        except Exception:
+            # Entities are not always updated after a failed refresh
+            self._end_profile_cycle()
+            raise
+
+    async def _async_add_executor_job(
+        self, func: Callable[..., _T], *args: Any, pair: str | None = None
+    ) -> _T:
+        """Run a blocking API call in the executor."""
+        if self._profile_cycle is None:
+            return await self.hass.async_add_executor_job(func, *args)
+        return await self._profile_cycle.async_add_executor_job(
+            self.hass, func, *args, pair=pair
+        )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing them when profiling."""
+        if self._profile_cycle is None:
+            super().async_update_listeners()
+            return
+
+        with self._profile_cycle.span("update_entities"):
+            super().async_update_listeners()
+        self._end_profile_cycle()
+
+    @callback
+    def async_stop_profiling(self) -> None:
+        """Detach any profiler, e.g. because the coordinator is being unloaded."""
+        if self.profiler is not None:
+            self.profiler.async_remove_coordinator(self)
+        self._profile_cycle = None
+
+    @callback
+    def _end_profile_cycle(self) -> None:
+        """Complete the current profiled cycle."""
+        if self._profile_cycle is not None:
+            self._profile_cycle.end()
+            self._profile_cycle = None
+
+
+class WalutomatBalancesCoordinator(WalutomatCoordinator[List[Dict[str, Any]]]):
     """Class to manage fetching Walutomat balances data."""
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: WalutomatClient):
         """Initialize."""
         self.client = client
+        self.entry = entry
         update_interval = timedelta(
             minutes=entry.options.get(
                 CONF_BALANCES_UPDATE_INTERVAL, DEFAULT_BALANCES_UPDATE_INTERVAL
@@ -41,11 +117,24 @@ class WalutomatBalancesCoordinator(DataUpdateCoordinator[List[Dict[str, Any]]]):
             update_interval=update_interval,
         )
 
-    async def _async_update_data(self) -> List[Dict[str, Any]]:
+    @property
+    def profile_name(self) -> str:
+        """Return the name used to tag profiled spans."""
+        return f"{self.name}_{self.entry.entry_id}"
+
+    async def _async_fetch(self) -> List[Dict[str, Any]]:
         """Fetch data from API endpoint."""
+        cached = get_client_registry(self.hass).pop_balances(
+            self.entry.data[CONF_API_KEY], self.entry.data.get("sandbox", False)
+        )
+        if cached is not None:
+            get_history(self.hass).record_balances(self.entry.entry_id, cached)
+            return cached
+
         try:
-            balances = await self.hass.async_add_executor_job(self.client.get_balances)
+            balances = await self._async_add_executor_job(self.client.get_balances)
             _LOGGER.debug("Fetched balances data: %s", balances)
+            get_history(self.hass).record_balances(self.entry.entry_id, balances)
             return balances
         except WalutomatAPIError as err:
             raise UpdateFailed(f"Error communicating with API for balances: {err}") from err
@@ -54,7 +143,7 @@ class WalutomatBalancesCoordinator(DataUpdateCoordinator[List[Dict[str, Any]]]):
             raise UpdateFailed(f"Unexpected error fetching walutomat_balances data: {err}") from err
 
 
-class WalutomatRatesCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+class WalutomatRatesCoordinator(WalutomatCoordinator[Dict[str, Any]]):
     """Class to manage fetching Walutomat public rates data."""
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
@@ -73,7 +162,7 @@ class WalutomatRatesCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
             update_interval=update_interval,
         )
 
-    async def _async_update_data(self) -> Dict[str, Any]:
+    async def _async_fetch(self) -> Dict[str, Any]:
         """Fetch data from public API endpoint."""
         selected_pairs = self.entry.options.get(
             CONF_CURRENCY_PAIRS, DEFAULT_CURRENCY_PAIRS
@@ -83,8 +172,8 @@ class WalutomatRatesCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
 
         async def _fetch_pair(pair: str):
             try:
-                return await self.hass.async_add_executor_job(
-                    WalutomatClient.get_public_rate, pair
+                return await self._async_add_executor_job(
+                    WalutomatClient.get_public_rate, pair, pair=pair
                 )
             except WalutomatAPIError as err:
                 _LOGGER.warning("Error fetching rate for %s: %s", pair, err)
@@ -100,4 +189,5 @@ class WalutomatRatesCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
             if rate is not None
         }
         _LOGGER.debug("Fetched rates data: %s", rates)
+        get_history(self.hass).record_rates(rates)
         return rates
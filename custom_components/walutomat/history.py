@@ -0,0 +1,143 @@
+"""In-memory rate and balance history for the Walutomat integration."""
+from __future__ import annotations
+
+import csv
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, EXPORT_CHUNK_SIZE, HISTORY_MAX_SNAPSHOTS
+
+HISTORY_COLUMNS = [
+    "timestamp",
+    "kind",
+    "source",
+    "name",
+    "buy_rate",
+    "sell_rate",
+    "balance_available",
+    "balance_total",
+    "balance_reserved",
+]
+
+
+class Snapshot(NamedTuple):
+    """A single coordinator result."""
+
+    timestamp: datetime
+    kind: str
+    source: str
+    data: Any
+
+
+class WalutomatHistory:
+    """Keep the most recent rate and balance snapshots."""
+
+    def __init__(self, maxlen: int = HISTORY_MAX_SNAPSHOTS) -> None:
+        """Initialize."""
+        self._snapshots: Deque[Snapshot] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        """Return the number of stored snapshots."""
+        return len(self._snapshots)
+
+    def record_rates(self, rates: Dict[str, Any]) -> None:
+        """Store a rates coordinator result."""
+        if rates:
+            self._snapshots.append(
+                Snapshot(dt_util.utcnow(), "rate", "public_rates", rates)
+            )
+
+    def record_balances(self, entry_id: str, balances: List[Dict[str, Any]]) -> None:
+        """Store a balances coordinator result."""
+        if balances:
+            self._snapshots.append(
+                Snapshot(dt_util.utcnow(), "balance", entry_id, balances)
+            )
+
+    def remove_source(self, source: str) -> None:
+        """Drop the snapshots recorded for a config entry."""
+        self._snapshots = deque(
+            (snapshot for snapshot in self._snapshots if snapshot.source != source),
+            maxlen=self._snapshots.maxlen,
+        )
+
+    def snapshots(self) -> List[Snapshot]:
+        """Return the stored snapshots.
+
+        Only references are copied, so the caller can iterate the result in
+        an executor while new snapshots are being recorded.
+        """
+        return list(self._snapshots)
+
+
+def iter_rows(
+    snapshots: Iterable[Snapshot],
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Flatten snapshots into rows, lazily, within the given time range."""
+    for snapshot in snapshots:
+        if start is not None and snapshot.timestamp < start:
+            continue
+        if end is not None and snapshot.timestamp > end:
+            continue
+        timestamp = snapshot.timestamp.isoformat()
+        if snapshot.kind == "rate":
+            for pair, rate in snapshot.data.items():
+                yield {
+                    "timestamp": timestamp,
+                    "kind": snapshot.kind,
+                    "source": snapshot.source,
+                    "name": pair,
+                    "buy_rate": rate.get("buyRate"),
+                    "sell_rate": rate.get("sellRate"),
+                }
+        else:
+            for balance in snapshot.data:
+                yield {
+                    "timestamp": timestamp,
+                    "kind": snapshot.kind,
+                    "source": snapshot.source,
+                    "name": balance.get("currency"),
+                    "balance_available": balance.get("balanceAvailable"),
+                    "balance_total": balance.get("balanceTotal"),
+                    "balance_reserved": balance.get("balanceReserved"),
+                }
+
+
+def iter_chunks(
+    rows: Iterable[Dict[str, Any]], columns: List[str], size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[List[List[Any]]]:
+    """Project rows onto the given columns and group them into chunks."""
+    chunk: List[List[Any]] = []
+    for row in rows:
+        chunk.append([row.get(column) for column in columns])
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_csv(path: str, chunks: Iterable[List[List[Any]]], columns: List[str]) -> int:
+    """Write chunks to a CSV file and return the number of rows written."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def get_history(hass: HomeAssistant) -> WalutomatHistory:
+    """Return the history buffer, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "history" not in domain_data:
+        domain_data["history"] = WalutomatHistory()
+    return domain_data["history"]
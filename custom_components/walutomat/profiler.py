@@ -0,0 +1,266 @@
+"""On-demand profiling of Walutomat refresh cycles."""
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    TypeVar,
+)
+
+from homeassistant.core import HomeAssistant, callback
+
+if TYPE_CHECKING:
+    from .coordinator import WalutomatCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class Span(NamedTuple):
+    """A timed phase of a refresh cycle."""
+
+    coordinator: str
+    cycle: int
+    phase: str
+    pair: str | None
+    start: float
+    duration: float
+
+
+class ProfileCycle:
+    """A single profiled refresh of one coordinator."""
+
+    def __init__(self, profiler: RefreshProfiler, coordinator: str, index: int) -> None:
+        """Initialize."""
+        self.profiler = profiler
+        self.coordinator = coordinator
+        self.index = index
+
+    def _add_span(self, phase: str, pair: str | None, start: float, end: float) -> None:
+        """Store a span unless the profiler has already finished."""
+        if not self.profiler.finished:
+            self.profiler.spans.append(
+                Span(self.coordinator, self.index, phase, pair, start, end - start)
+            )
+
+    @contextmanager
+    def span(self, phase: str, pair: str | None = None) -> Iterator[None]:
+        """Time the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_span(phase, pair, start, time.perf_counter())
+
+    async def async_add_executor_job(
+        self, hass: HomeAssistant, func: Callable[..., _T], *args: Any, pair: str | None = None
+    ) -> _T:
+        """Run a job in the executor, timing the queue wait and the call itself.
+
+        With cProfile, calls wait for each other. That wait is recorded as a
+        separate span so it does not inflate the request time of a pair.
+        """
+        submitted = time.perf_counter()
+        times: List[float] = []
+
+        def _run() -> _T:
+            times.append(time.perf_counter())
+            with self.profiler.lock():
+                times.append(time.perf_counter())
+                try:
+                    return self.profiler.call(func, *args)
+                finally:
+                    times.append(time.perf_counter())
+
+        try:
+            return await hass.async_add_executor_job(_run)
+        finally:
+            if len(times) == 3:
+                self._add_span("executor_wait", pair, submitted, times[0])
+                if self.profiler.uses_cprofile:
+                    self._add_span("profile_lock_wait", pair, times[0], times[1])
+                self._add_span("request", pair, times[1], times[2])
+
+    def end(self) -> None:
+        """Mark the cycle as complete."""
+        self.profiler.end_cycle(self.coordinator)
+
+
+class RefreshProfiler:
+    """Record span timings, and optionally cProfile, for the next refresh cycles.
+
+    Each attached coordinator is profiled for the given number of cycles.
+    Coordinators only check whether a profiler is attached, so there is no
+    cost while profiling is off. With cProfile enabled, executor jobs of the
+    profiled cycles run one at a time because only one profiler can be active.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: List[WalutomatCoordinator],
+        cycles: int,
+        use_cprofile: bool = False,
+        filename: str | None = None,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.coordinators = coordinators
+        self.cycles = cycles
+        self.filename = filename
+        self.spans: List[Span] = []
+        self.finished = False
+        self._started = 0
+        self._completed = {coordinator.profile_name: 0 for coordinator in coordinators}
+        self._profile = cProfile.Profile() if use_cprofile else None
+        self._profile_lock = threading.Lock()
+
+    @property
+    def uses_cprofile(self) -> bool:
+        """Return whether executor jobs run under cProfile."""
+        return self._profile is not None
+
+    def lock(self) -> ContextManager[Any]:
+        """Return the lock serializing executor jobs while cProfile is enabled."""
+        if self._profile is None:
+            return nullcontext()
+        return self._profile_lock
+
+    @callback
+    def async_attach(self) -> None:
+        """Start profiling the attached coordinators."""
+        for coordinator in self.coordinators:
+            coordinator.profiler = self
+
+    def start_cycle(self, coordinator: str) -> ProfileCycle:
+        """Start a new refresh cycle."""
+        self._started += 1
+        return ProfileCycle(self, coordinator, self._started)
+
+    def call(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Call a function, under cProfile if enabled.
+
+        Must be called while holding lock().
+        """
+        if self._profile is None:
+            return func(*args)
+        try:
+            self._profile.enable()
+        except ValueError as err:
+            # Another profiling tool took over since the service was called
+            _LOGGER.warning("cProfile unavailable, recording span timings only: %s", err)
+            self._profile = None
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            self._profile.disable()
+
+    def end_cycle(self, coordinator: str) -> None:
+        """Finish the profile once every coordinator has completed its cycles."""
+        if self.finished or coordinator not in self._completed:
+            return
+        self._completed[coordinator] += 1
+        if self._completed[coordinator] >= self.cycles:
+            # Stop profiling this coordinator while the others catch up
+            for attached in self.coordinators:
+                if attached.profile_name == coordinator and attached.profiler is self:
+                    attached.profiler = None
+        self._finish_if_done()
+
+    @callback
+    def async_remove_coordinator(self, coordinator: WalutomatCoordinator) -> None:
+        """Stop waiting for a coordinator that is being unloaded."""
+        if coordinator.profiler is self:
+            coordinator.profiler = None
+        if self._completed.pop(coordinator.profile_name, None) is not None:
+            _LOGGER.debug(
+                "Stopped profiling %s before it completed its cycles",
+                coordinator.profile_name,
+            )
+        self._finish_if_done()
+
+    def _finish_if_done(self) -> None:
+        """Log the summary and write the files once no coordinator is pending."""
+        if self.finished:
+            return
+        if all(completed >= self.cycles for completed in self._completed.values()):
+            self.finished = True
+            _LOGGER.info("Walutomat refresh profile:\n%s", self.summary())
+            if self.filename:
+                self.hass.async_create_task(self._async_write())
+
+    def summary(self) -> str:
+        """Return the spans aggregated per coordinator, phase and pair."""
+        totals: Dict[tuple, List[float]] = defaultdict(list)
+        for span in self.spans:
+            totals[(span.coordinator, span.phase, span.pair)].append(span.duration)
+
+        lines = ["coordinator phase pair count total_ms max_ms"]
+        for (coordinator, phase, pair), durations in sorted(
+            totals.items(), key=lambda item: sum(item[1]), reverse=True
+        ):
+            lines.append(
+                f"{coordinator} {phase} {pair or '-'} {len(durations)} "
+                f"{sum(durations) * 1000:.2f} {max(durations) * 1000:.2f}"
+            )
+        return "\n".join(lines)
+
+    def _trace_events(self) -> List[Dict[str, Any]]:
+        """Return the spans in Chrome trace event format."""
+        origin = min((span.start for span in self.spans), default=0.0)
+        return [
+            {
+                "name": f"{span.phase} {span.pair}" if span.pair else span.phase,
+                "cat": span.coordinator,
+                "ph": "X",
+                "ts": (span.start - origin) * 1_000_000,
+                "dur": span.duration * 1_000_000,
+                "pid": 0,
+                "tid": span.cycle,
+                "args": {"phase": span.phase, "pair": span.pair},
+            }
+            for span in self.spans
+        ]
+
+    def _write(self) -> None:
+        """Write the trace file, and the cProfile stats if they were recorded."""
+        with open(self.filename, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": self._trace_events()}, file)
+        if self._profile is not None:
+            self._profile.dump_stats(f"{os.path.splitext(self.filename)[0]}.prof")
+
+    async def _async_write(self) -> None:
+        """Write the profile files in the executor."""
+        try:
+            await self.hass.async_add_executor_job(self._write)
+        except OSError as err:
+            _LOGGER.error("Failed to write Walutomat profile to %s: %s", self.filename, err)
+        else:
+            _LOGGER.info("Wrote Walutomat profile to %s", self.filename)
+
+
+def cprofile_in_use() -> bool:
+    """Return whether another profiling tool is already active.
+
+    From Python 3.12 cProfile is process-wide, so only one can run at a time.
+    """
+    if sys.version_info < (3, 12):
+        return False
+    return sys.monitoring.get_tool(sys.monitoring.PROFILER_ID) is not None
@@ -0,0 +1,70 @@
+"""Effective-rate quotes from cached Walutomat rates."""
+from __future__ import annotations
+
+from decimal import ROUND_DOWN, ROUND_UP, Decimal
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.exceptions import HomeAssistantError
+
+DIRECTION_BUY = "buy"
+DIRECTION_SELL = "sell"
+
+_CENT = Decimal("0.01")
+# Round in the exchange's favour: what you receive down, what you pay up
+_ROUNDING = {DIRECTION_BUY: ROUND_UP, DIRECTION_SELL: ROUND_DOWN}
+
+
+def _effective_rate(
+    rates: Dict[str, Any], pair: str, direction: str, fee: Decimal
+) -> Decimal:
+    """Return the price of one unit of the pair's base currency, fee included.
+
+    Buying the base currency costs the market buy rate plus the fee. Selling
+    it yields the market sell rate minus the fee. Pairs quoted the other way
+    round on Walutomat (e.g. PLN_EUR) are answered from the inverse rate.
+    """
+    if pair in rates:
+        rate = rates[pair]
+        if direction == DIRECTION_BUY:
+            return Decimal(str(rate["buyRate"])) * (1 + fee)
+        return Decimal(str(rate["sellRate"])) * (1 - fee)
+
+    base, _, quote = pair.partition("_")
+    inverse = f"{quote}_{base}"
+    if inverse not in rates:
+        raise HomeAssistantError(f"No rate available for {pair}")
+    rate = rates[inverse]
+    # Buying the base currency means selling the inverse pair's base currency
+    if direction == DIRECTION_BUY:
+        return (1 + fee) / Decimal(str(rate["sellRate"]))
+    return (1 - fee) / Decimal(str(rate["buyRate"]))
+
+
+def quote(
+    rates: Dict[str, Any], requests: List[Dict[str, Any]], fee_percent: float
+) -> List[Dict[str, Any]]:
+    """Price each amount of a pair's base currency in its quote currency."""
+    fee = Decimal(str(fee_percent)) / 100
+    # Each pair and direction is priced once, however many amounts use it
+    effective: Dict[Tuple[str, str], Decimal] = {}
+    for request in requests:
+        key = (request["pair"], request["direction"])
+        if key not in effective:
+            effective[key] = _effective_rate(rates, *key, fee)
+
+    results = []
+    for request in requests:
+        rate = effective[(request["pair"], request["direction"])]
+        result = (Decimal(str(request["amount"])) * rate).quantize(
+            _CENT, rounding=_ROUNDING[request["direction"]]
+        )
+        results.append(
+            {
+                "pair": request["pair"],
+                "direction": request["direction"],
+                "amount": request["amount"],
+                "rate": float(rate),
+                "result": float(result),
+            }
+        )
+    return results
@@ -0,0 +1,205 @@
+"""Services for the Walutomat integration."""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_FEE_PERCENT, DEFAULT_FEE_PERCENT, DOMAIN
+from .history import HISTORY_COLUMNS, get_history, iter_chunks, iter_rows, write_csv
+from .profiler import RefreshProfiler, cprofile_in_use
+from .quote import DIRECTION_BUY, DIRECTION_SELL, quote
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_EXPORT_HISTORY = "export_history"
+SERVICE_PROFILE = "profile"
+SERVICE_QUOTE = "quote"
+
+ATTR_FILENAME = "filename"
+ATTR_COLUMNS = "columns"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_CYCLES = "cycles"
+ATTR_CPROFILE = "cprofile"
+ATTR_PAIR = "pair"
+ATTR_AMOUNT = "amount"
+ATTR_DIRECTION = "direction"
+ATTR_QUOTES = "quotes"
+ATTR_FEE_PERCENT = "fee_percent"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_COLUMNS, default=HISTORY_COLUMNS): vol.All(
+            cv.ensure_list_csv, [vol.In(HISTORY_COLUMNS)]
+        ),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(ATTR_CPROFILE, default=False): cv.boolean,
+        vol.Optional(ATTR_FILENAME): cv.string,
+    }
+)
+
+QUOTE_REQUEST_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PAIR): vol.All(cv.string, vol.Upper),
+        vol.Required(ATTR_AMOUNT): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(ATTR_DIRECTION, default=DIRECTION_SELL): vol.In(
+            [DIRECTION_BUY, DIRECTION_SELL]
+        ),
+    }
+)
+
+QUOTE_SCHEMA = vol.Schema(
+    vol.All(
+        {
+            vol.Optional(ATTR_PAIR): vol.All(cv.string, vol.Upper),
+            vol.Optional(ATTR_AMOUNT): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(ATTR_DIRECTION): vol.In([DIRECTION_BUY, DIRECTION_SELL]),
+            vol.Optional(ATTR_QUOTES): vol.All(cv.ensure_list, [QUOTE_REQUEST_SCHEMA]),
+            vol.Optional(ATTR_FEE_PERCENT): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=100)
+            ),
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        },
+        cv.has_at_least_one_key(ATTR_PAIR, ATTR_QUOTES),
+        cv.key_dependency(ATTR_PAIR, ATTR_AMOUNT),
+    )
+)
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Walutomat services."""
+    if hass.services.has_service(DOMAIN, SERVICE_EXPORT_HISTORY):
+        return
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Write the stored rate and balance history to a CSV file."""
+        path = call.data[ATTR_FILENAME]
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Writing to {path} is not allowed")
+
+        columns = call.data[ATTR_COLUMNS]
+        start = call.data.get(ATTR_START)
+        end = call.data.get(ATTR_END)
+        chunks = iter_chunks(
+            iter_rows(
+                get_history(hass).snapshots(),
+                dt_util.as_utc(start) if start else None,
+                dt_util.as_utc(end) if end else None,
+            ),
+            columns,
+        )
+        try:
+            rows = await hass.async_add_executor_job(write_csv, path, chunks, columns)
+        except OSError as err:
+            raise HomeAssistantError(f"Failed to export history to {path}: {err}") from err
+
+        _LOGGER.debug("Exported %d history rows to %s", rows, path)
+        return {"filename": path, "rows": rows}
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the next refresh cycles of each Walutomat coordinator."""
+        path = call.data.get(ATTR_FILENAME)
+        if path and not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Writing to {path} is not allowed")
+
+        coordinators = [hass.data[DOMAIN]["rates_coordinator"]] + [
+            entry_data["balances_coordinator"]
+            for entry_data in hass.data[DOMAIN].values()
+            if isinstance(entry_data, dict) and "balances_coordinator" in entry_data
+        ]
+        if any(coordinator.profiler is not None for coordinator in coordinators):
+            raise HomeAssistantError("A Walutomat profile is already running")
+        if call.data[ATTR_CPROFILE] and cprofile_in_use():
+            raise HomeAssistantError(
+                "cProfile cannot run while another profiler is active"
+            )
+
+        RefreshProfiler(
+            hass,
+            coordinators,
+            call.data[ATTR_CYCLES],
+            call.data[ATTR_CPROFILE],
+            path,
+        ).async_attach()
+        _LOGGER.info(
+            "Profiling the next %d refresh cycles of each Walutomat coordinator",
+            call.data[ATTR_CYCLES],
+        )
+
+    async def async_quote(call: ServiceCall) -> ServiceResponse:
+        """Price amounts of currency pairs from the cached rates."""
+        rates_coordinator = hass.data[DOMAIN]["rates_coordinator"]
+        requests = list(call.data.get(ATTR_QUOTES, []))
+        if ATTR_PAIR in call.data:
+            requests.append(
+                QUOTE_REQUEST_SCHEMA(
+                    {
+                        key: call.data[key]
+                        for key in (ATTR_PAIR, ATTR_AMOUNT, ATTR_DIRECTION)
+                        if key in call.data
+                    }
+                )
+            )
+        # Rates are shared, but each entry has its own fee. Without an explicit
+        # entry, the fee of the entry that set up the rates coordinator is used.
+        fee_entry = rates_coordinator.entry
+        if ATTR_CONFIG_ENTRY_ID in call.data:
+            fee_entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+            if fee_entry is None or fee_entry.domain != DOMAIN:
+                raise HomeAssistantError(
+                    f"Unknown Walutomat config entry {call.data[ATTR_CONFIG_ENTRY_ID]}"
+                )
+        fee_percent = call.data.get(
+            ATTR_FEE_PERCENT,
+            fee_entry.options.get(CONF_FEE_PERCENT, DEFAULT_FEE_PERCENT),
+        )
+        return {
+            "quotes": quote(rates_coordinator.data or {}, requests, fee_percent),
+            "fee_percent": fee_percent,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUOTE,
+        async_quote,
+        schema=QUOTE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+async def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the Walutomat services."""
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT_HISTORY)
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_QUOTE)
@@ -20,7 +20,7 @@ async def test_form(hass: HomeAssistant) -> None:
     assert not result["errors"]
 
     with patch(
-        "custom_components.walutomat.config_flow.WalutomatClient.get_balances",
+        "walutomat_py.WalutomatClient.get_balances",
         return_value=[],
     ), patch(
         "custom_components.walutomat.async_setup_entry",
@@ -48,7 +48,7 @@ async def test_form_cannot_connect(hass: HomeAssistant) -> None:
     )
 
     with patch(
-        "custom_components.walutomat.config_flow.WalutomatClient.get_balances",
+        "walutomat_py.WalutomatClient.get_balances",
         side_effect=WalutomatAPIError("API Key invalid"),
     ):
         result2 = await hass.config_entries.flow.async_configure(
@@ -70,7 +70,7 @@ async def test_form_unknown_exception(hass: HomeAssistant) -> None:
     )
 
     with patch(
-        "custom_components.walutomat.config_flow.WalutomatClient.get_balances",
+        "walutomat_py.WalutomatClient.get_balances",
         side_effect=Exception("Unexpected error"),
     ):
         result2 = await hass.config_entries.flow.async_configure(
@@ -82,3 +82,37 @@ async def test_form_unknown_exception(hass: HomeAssistant) -> None:
 
     assert result2["type"] == data_entry_flow.FlowResultType.FORM
     assert result2["errors"] == {"base": "unknown"}
+
+
+@pytest.mark.asyncio
+async def test_form_reuses_validation_balances(hass: HomeAssistant) -> None:
+    """Test the first balances refresh reuses the validation result."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    with patch(
+        "walutomat_py.WalutomatClient.get_balances",
+        return_value=[
+            {
+                "currency": "EUR",
+                "balanceAvailable": "90.50",
+                "balanceTotal": "100.50",
+                "balanceReserved": "10.00",
+            }
+        ],
+    ) as mock_get_balances, patch(
+        "walutomat_py.WalutomatClient.get_public_rate",
+        return_value={"buyRate": 4.5, "sellRate": 4.6},
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_API_KEY: "test-api-key",
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result2["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert mock_get_balances.call_count == 1
+    assert hass.states.get("sensor.walutomat_balance_eur").state == "90.50"
@@ -0,0 +1,258 @@
+"""Tests for the Walutomat services."""
+import csv
+import json
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.walutomat.const import DOMAIN, CONF_CURRENCY_PAIRS, CONF_FEE_PERCENT
+
+
+@pytest.mark.asyncio
+async def test_export_history(hass: HomeAssistant, tmp_path) -> None:
+    """Test exporting the rate history to a CSV file."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_CURRENCY_PAIRS: ["EUR_PLN", "USD_PLN"],
+        },
+        entry_id="test-rates",
+    )
+
+    with patch(
+        "walutomat_py.WalutomatClient.get_public_rate",
+        side_effect=[
+            {"buyRate": 4.5, "sellRate": 4.6},
+            {"buyRate": 3.8, "sellRate": 3.9},
+        ],
+    ):
+        config_entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    path = tmp_path / "history.csv"
+    response = await hass.services.async_call(
+        DOMAIN,
+        "export_history",
+        {"filename": str(path), "columns": "name, buy_rate, sell_rate"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"filename": str(path), "rows": 2}
+    content = await hass.async_add_executor_job(path.read_text, "utf-8")
+    rows = list(csv.reader(content.splitlines()))
+    assert rows == [
+        ["name", "buy_rate", "sell_rate"],
+        ["EUR_PLN", "4.5", "4.6"],
+        ["USD_PLN", "3.8", "3.9"],
+    ]
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            "export_history",
+            {"filename": "/not/allowed/history.csv"},
+            blocking=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_profile(hass: HomeAssistant, tmp_path) -> None:
+    """Test profiling a rates refresh cycle."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_CURRENCY_PAIRS: ["EUR_PLN"],
+        },
+        entry_id="test-rates",
+    )
+
+    with patch(
+        "walutomat_py.WalutomatClient.get_public_rate",
+        return_value={"buyRate": 4.5, "sellRate": 4.6},
+    ):
+        config_entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        hass.config.allowlist_external_dirs = {str(tmp_path)}
+        path = tmp_path / "trace.json"
+        await hass.services.async_call(
+            DOMAIN,
+            "profile",
+            {"cycles": 1, "cprofile": True, "filename": str(path)},
+            blocking=True,
+        )
+        rates_coordinator = hass.data[DOMAIN]["rates_coordinator"]
+        assert rates_coordinator.profiler is not None
+
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(DOMAIN, "profile", {}, blocking=True)
+
+        await rates_coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert rates_coordinator.profiler is None
+    content = await hass.async_add_executor_job(path.read_text, "utf-8")
+    events = json.loads(content)["traceEvents"]
+    phases = {(event["args"]["phase"], event["args"]["pair"]) for event in events}
+    assert ("update_data", None) in phases
+    assert ("request", "EUR_PLN") in phases
+    assert ("profile_lock_wait", "EUR_PLN") in phases
+    assert ("update_entities", None) in phases
+    assert (tmp_path / "trace.prof").exists()
+
+
+@pytest.mark.asyncio
+async def test_quote(hass: HomeAssistant) -> None:
+    """Test quoting amounts from the cached rates."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_CURRENCY_PAIRS: ["EUR_PLN"],
+            CONF_FEE_PERCENT: 1.0,
+        },
+        entry_id="test-rates",
+    )
+
+    with patch(
+        "walutomat_py.WalutomatClient.get_public_rate",
+        return_value={"buyRate": "4.5", "sellRate": "4.0"},
+    ) as mock_get_public_rate:
+        config_entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        calls = mock_get_public_rate.call_count
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "quote",
+            {
+                "quotes": [
+                    {"pair": "EUR_PLN", "amount": 100},
+                    {"pair": "EUR_PLN", "amount": 100, "direction": "buy"},
+                    {"pair": "PLN_EUR", "amount": 400},
+                ]
+            },
+            blocking=True,
+            return_response=True,
+        )
+        assert mock_get_public_rate.call_count == calls
+
+    assert response["fee_percent"] == 1.0
+    assert [quote["result"] for quote in response["quotes"]] == [396.0, 454.5, 88.0]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "quote",
+        {"pair": "EUR_PLN", "amount": 100, "fee_percent": 0},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["quotes"][0]["result"] == 400.0
+
+    # Half cents are rounded down when selling and up when buying
+    response = await hass.services.async_call(
+        DOMAIN,
+        "quote",
+        {
+            "quotes": [
+                {"pair": "EUR_PLN", "amount": 1.25375},
+                {"pair": "EUR_PLN", "amount": 1.001, "direction": "buy"},
+            ],
+            "fee_percent": 0,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert [quote["result"] for quote in response["quotes"]] == [5.01, 4.51]
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            "quote",
+            {"pair": "USD_PLN", "amount": 100},
+            blocking=True,
+            return_response=True,
+        )
+
+    account_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test-api-key"},
+        options={CONF_FEE_PERCENT: 2.0},
+        entry_id="test-account",
+    )
+    with patch("walutomat_py.WalutomatClient.get_balances", return_value=[]):
+        account_entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(account_entry.entry_id)
+        await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "quote",
+        {"pair": "EUR_PLN", "amount": 100, "config_entry_id": "test-account"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["fee_percent"] == 2.0
+    assert response["quotes"][0]["result"] == 392.0
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            "quote",
+            {"pair": "EUR_PLN", "amount": 100, "config_entry_id": "missing"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_profile_finishes_on_reload(hass: HomeAssistant, tmp_path) -> None:
+    """Test a running profile is written when its coordinator is unloaded."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={
+            CONF_CURRENCY_PAIRS: ["EUR_PLN"],
+        },
+        entry_id="test-rates",
+    )
+
+    with patch(
+        "walutomat_py.WalutomatClient.get_public_rate",
+        return_value={"buyRate": 4.5, "sellRate": 4.6},
+    ):
+        config_entry.add_to_hass(hass)
+        await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        hass.config.allowlist_external_dirs = {str(tmp_path)}
+        path = tmp_path / "trace.json"
+        await hass.services.async_call(
+            DOMAIN,
+            "profile",
+            {"cycles": 5, "filename": str(path)},
+            blocking=True,
+        )
+        old_coordinator = hass.data[DOMAIN]["rates_coordinator"]
+        await old_coordinator.async_refresh()
+
+        await hass.config_entries.async_reload(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        assert old_coordinator.profiler is None
+        assert path.exists()
+
+        # The old profile no longer blocks a new one
+        await hass.services.async_call(DOMAIN, "profile", {}, blocking=True)
+        assert hass.data[DOMAIN]["rates_coordinator"].profiler is not None